@@ -1,11 +1,138 @@
 #!/usr/bin/env python3
+"""Apply schemas/weaviate_schema.json to Weaviate.
+
+  python scripts/apply_weaviate_schema.py            # create missing classes
+  python scripts/apply_weaviate_schema.py --migrate  # move single-tenant classes to per-tenant shards
+
+Weaviate cannot enable multi-tenancy on an existing class, so --migrate dumps
+each legacy class (properties, ids and vectors) to a JSONL backup, recreates the
+class from the schema file, creates one tenant per distinct tenantId and
+re-imports every object into its tenant shard. Object ids are preserved so
+Citation.chunkId references stay valid. If the import fails midway, re-run
+with --from-backup to reload from the dump without touching Weaviate first.
+"""
 from __future__ import annotations
-import os, json, requests
+import argparse, os, json, requests
 
 ENDPOINT = os.getenv("WEAVIATE_ENDPOINT", "http://localhost:8080").rstrip("/")
 SCHEMA_PATH = os.getenv("WEAVIATE_SCHEMA", "schemas/weaviate_schema.json")
+BACKUP_DIR = os.getenv("WEAVIATE_BACKUP_DIR", "backups")
+PAGE_SIZE = 500
+DEFAULT_TENANT = os.getenv("SERVICE_TENANT_ID", "tenant-dev")
+
+
+def _is_multi_tenant(cls: dict) -> bool:
+    return bool((cls.get("multiTenancyConfig") or {}).get("enabled"))
+
+
+def _create_class(cls: dict) -> bool:
+    # Weaviate 1.32 accepts POST of a single class object to /v1/schema
+    resp = requests.post(f"{ENDPOINT}/v1/schema", json=cls)
+    if resp.status_code >= 300:
+        print(f"[error] {cls.get('class')}: {resp.status_code} {resp.text}")
+        return False
+    return True
+
+
+def _dump_class(name: str, path: str) -> int:
+    """Stream every object of a (single-tenant) class to JSONL using the cursor API."""
+    count, after = 0, None
+    with open(path, "w") as f:
+        while True:
+            params = {"class": name, "limit": PAGE_SIZE, "include": "vector"}
+            if after:
+                params["after"] = after
+            r = requests.get(f"{ENDPOINT}/v1/objects", params=params, timeout=60)
+            r.raise_for_status()
+            objs = r.json().get("objects") or []
+            if not objs:
+                return count
+            for o in objs:
+                f.write(json.dumps({"id": o["id"], "properties": o.get("properties", {}), "vector": o.get("vector")}) + "\n")
+            count += len(objs)
+            after = objs[-1]["id"]
+
+
+def _iter_backup(path: str):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _load_class(name: str, path: str) -> int:
+    """Re-import a JSONL dump into per-tenant shards of a multi-tenant class.
+
+    The dump is streamed twice (tenant ids, then PAGE_SIZE import batches) so
+    vectors for the whole corpus are never held in memory at once.
+    """
+    tenants = sorted({row["properties"].get("tenantId") or DEFAULT_TENANT for row in _iter_backup(path)})
+    have = {t.get("name") for t in requests.get(f"{ENDPOINT}/v1/schema/{name}/tenants", timeout=60).json() or []}
+    missing = [t for t in tenants if t not in have]
+    if missing:
+        r = requests.post(f"{ENDPOINT}/v1/schema/{name}/tenants", json=[{"name": t} for t in missing], timeout=60)
+        if r.status_code >= 300:
+            raise RuntimeError(f"creating tenants for {name}: {r.status_code} {r.text}")
+
+    def flush(objects: list) -> None:
+        r = requests.post(f"{ENDPOINT}/v1/batch/objects", json={"objects": objects}, timeout=300)
+        r.raise_for_status()
+        errors = [o["result"]["errors"] for o in r.json() if (o.get("result") or {}).get("errors")]
+        if errors:
+            raise RuntimeError(f"importing {name}: {errors[0]}")
+
+    count, objects = 0, []
+    for row in _iter_backup(path):
+        tenant = row["properties"].get("tenantId") or DEFAULT_TENANT
+        obj = {"class": name, "id": row["id"], "properties": dict(row["properties"], tenantId=tenant), "tenant": tenant}
+        if row.get("vector"):
+            obj["vector"] = row["vector"]
+        objects.append(obj)
+        if len(objects) >= PAGE_SIZE:
+            flush(objects)
+            count += len(objects)
+            objects = []
+    if objects:
+        flush(objects)
+        count += len(objects)
+    print(f"[ok] {name}: {count} objects into {len(tenants)} tenant shards")
+    return count
+
+
+def migrate(cls: dict, existing: dict, from_backup: bool) -> bool:
+    name = cls.get("class")
+    path = os.path.join(BACKUP_DIR, f"{name}.jsonl")
+    if not from_backup:
+        if _is_multi_tenant(existing):
+            print(f"[skip] {name} already multi-tenant")
+            return True
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        n = _dump_class(name, path)
+        print(f"[ok] backed up {n} {name} objects to {path}")
+        r = requests.delete(f"{ENDPOINT}/v1/schema/{name}", timeout=60)
+        if r.status_code >= 300:
+            print(f"[error] deleting {name}: {r.status_code} {r.text}")
+            return False
+    elif existing and not _is_multi_tenant(existing):
+        # Loading tenant-scoped objects into a legacy class would fail halfway through
+        print(f"[error] {name} still exists as a single-tenant class; run --migrate without --from-backup")
+        return False
+    if not existing or not from_backup:
+        if not _create_class(cls):
+            return False
+    try:
+        _load_class(name, path)
+    except (OSError, RuntimeError, requests.RequestException) as e:
+        print(f"[error] {name}: {e}. Backup kept at {path}; re-run with --migrate --from-backup")
+        return False
+    return True
+
 
 def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--migrate", action="store_true", help="Convert existing single-tenant classes to native multi-tenancy")
+    ap.add_argument("--from-backup", action="store_true", help="With --migrate: reload from existing JSONL backups only")
+    args = ap.parse_args()
     with open(SCHEMA_PATH, "r") as f:
         data = json.load(f)
     # Ensure server is reachable
@@ -17,17 +144,25 @@ def main() -> int:
         return 1
     # Fetch existing classes
     ex = requests.get(f"{ENDPOINT}/v1/schema").json().get("classes", [])
-    existing = {c.get("class") for c in ex}
+    existing = {c.get("class"): c for c in ex}
     created = 0
     for cls in data.get("classes", []):
         name = cls.get("class")
         if name in existing:
-            print(f"[skip] {name} exists")
+            if args.migrate and _is_multi_tenant(cls):
+                if not migrate(cls, existing[name], args.from_backup):
+                    return 1
+                continue
+            if _is_multi_tenant(cls) and not _is_multi_tenant(existing[name]):
+                print(f"[warn] {name} exists without multi-tenancy; run with --migrate")
+            else:
+                print(f"[skip] {name} exists")
+            continue
+        if args.migrate and args.from_backup and os.path.exists(os.path.join(BACKUP_DIR, f"{name}.jsonl")):
+            if not migrate(cls, {}, True):
+                return 1
             continue
-        # Weaviate 1.32 accepts POST of a single class object to /v1/schema
-        resp = requests.post(f"{ENDPOINT}/v1/schema", json=cls)
-        if resp.status_code >= 300:
-            print(f"[error] {name}: {resp.status_code} {resp.text}")
+        if not _create_class(cls):
             return 1
         print(f"[ok] created {name}")
         created += 1
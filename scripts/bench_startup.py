@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Measure API server cold start: import time of financial_ai.mcp.server and warm-up time.
+
+Each import is timed in a fresh interpreter. Exits non-zero if a heavy dependency is
+loaded at import time or the median import exceeds --max-import-seconds.
+
+Usage: PYTHONPATH=src python scripts/bench_startup.py [--runs 5] [--warmup] [--max-import-seconds 2]
+"""
+from __future__ import annotations
+import argparse, json, os, statistics, subprocess, sys
+
+HEAVY = ("weaviate", "requests", "openpyxl", "pandas", "pdfminer", "fitz", "pytesseract")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import financial_ai.mcp.server as server
+t1 = time.perf_counter()
+state = server.warm_up() if {warmup} else {{}}
+t2 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "warmup": t2 - t1, "state": state,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules and not {warmup}]}}))
+"""
+
+
+def _run(warmup: bool) -> dict:
+    env = dict(os.environ, SERVICE_WARMUP="0")
+    env.setdefault("PYTHONPATH", "src")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(warmup=warmup, heavy=HEAVY)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--warmup", action="store_true", help="Also time warm_up() against live Weaviate/Ollama")
+    ap.add_argument("--max-import-seconds", type=float, default=None)
+    args = ap.parse_args()
+
+    runs = [_run(False) for _ in range(args.runs)]
+    imports = [r["import"] for r in runs]
+    median = statistics.median(imports)
+    print(f"import financial_ai.mcp.server: median {median * 1000:.0f} ms, min {min(imports) * 1000:.0f} ms over {args.runs} runs")
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    print(f"heavy modules loaded at import: {', '.join(heavy) or 'none'}")
+    if args.warmup:
+        r = _run(True)
+        print(f"warm_up(): {r['warmup'] * 1000:.0f} ms  {r['state']}")
+
+    failed = bool(heavy)
+    if args.max_import_seconds is not None and median > args.max_import_seconds:
+        print(f"[fail] median import {median:.2f}s exceeds {args.max_import_seconds:.2f}s")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
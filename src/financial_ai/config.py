@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -11,6 +11,8 @@ class WeaviateConfig:
     api_key: Optional[str] = os.getenv("WEAVIATE_API_KEY")
     class_chunk: str = os.getenv("WEAVIATE_CLASS_CHUNK", "Chunk")
     class_table: str = os.getenv("WEAVIATE_CLASS_TABLE", "TableCell")
+    # Native multi-tenancy: one shard per tenant, queries scoped with .with_tenant()
+    multi_tenancy: bool = os.getenv("WEAVIATE_MULTI_TENANCY", "1") not in ("0", "false", "False")
 
 
 @dataclass
@@ -18,6 +20,18 @@ class ServiceConfig:
     tenant_id: str = os.getenv("SERVICE_TENANT_ID", "tenant-dev")
     artifacts_dir: str = os.getenv("ARTIFACTS_DIR", "artifacts")
     context_first: bool = True
+    # Pre-connect to Weaviate and pre-load the Ollama model before reporting ready
+    warmup: bool = os.getenv("SERVICE_WARMUP", "1") not in ("0", "false", "False")
+
+
+@dataclass
+class IngestionConfig:
+    # "pymupdf" (fast, page-parallel) or "pdfminer" (legacy whole-document path)
+    pdf_backend: str = os.getenv("PDF_BACKEND", "pymupdf")
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "0"))  # 0 -> os.cpu_count()
+    ocr_enabled: bool = os.getenv("PDF_OCR", "1") not in ("0", "false", "False")
+    ocr_lang: str = os.getenv("PDF_OCR_LANG", "eng")
+    ocr_dpi: int = int(os.getenv("PDF_OCR_DPI", "300"))
 
 
 @dataclass
@@ -25,16 +39,18 @@ class LLMConfig:
     provider: str = os.getenv("LLM_PROVIDER", "openai")
     model: str = os.getenv("LLM_MODEL", "gpt-4o-mini")
     api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
+    ollama_url: str = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+    # How long Ollama keeps the model resident after a request
+    ollama_keep_alive: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
 
 @dataclass
 class Config:
-    weaviate: WeaviateConfig = WeaviateConfig()
-    service: ServiceConfig = ServiceConfig()
-    llm: LLMConfig = LLMConfig()
+    weaviate: WeaviateConfig = field(default_factory=WeaviateConfig)
+    service: ServiceConfig = field(default_factory=ServiceConfig)
+    ingestion: IngestionConfig = field(default_factory=IngestionConfig)
+    llm: LLMConfig = field(default_factory=LLMConfig)
 
 
 config = Config()
-
-# Ensure artifacts directory exists at import time for convenience
-os.makedirs(config.service.artifacts_dir, exist_ok=True)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import io
+import os
 import re
 import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Optional
-
-import pandas as pd
-from pdfminer.high_level import extract_text
+from typing import Dict, List, Optional, Tuple
 
 from ..config import config
 from ..storage.weaviate_client import WeaviateStore
@@ -15,6 +16,10 @@ NAME_RE = re.compile(r"^(?P<name>.+)_Q(?P<q>[1-4])_(?P<year>\d{4})", re.IGNORECA
 # Allow inferring period from parent directories like "2024q1", "2024Q2"
 DIR_QY_RE = re.compile(r"^(?P<year>20\d{2})\s*[-_ ]?q(?P<q>[1-4])$", re.IGNORECASE)
 
+PDF_BACKENDS = ("pymupdf", "pdfminer")
+# Below this many pages per worker, process start-up costs more than it saves
+MIN_PAGES_PER_WORKER = 8
+
 
 def infer_metadata(file_path: Path) -> Dict[str, Optional[str]]:
     m = NAME_RE.match(file_path.stem)
@@ -39,26 +44,115 @@ def infer_metadata(file_path: Path) -> Dict[str, Optional[str]]:
     return meta
 
 
-def pdf_to_chunks(file: Path) -> List[Dict]:
-    text = extract_text(str(file))
+def text_to_chunks(text: str, page: int = 1, lines_per_chunk: int = 6) -> List[Dict]:
     chunks: List[Dict] = []
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    for i in range(0, len(lines), lines_per_chunk):
+        snippet = " ".join(lines[i:i+lines_per_chunk])
+        chunks.append({
+            "page": page,
+            "lineStart": i + 1,
+            "lineEnd": min(i + lines_per_chunk, len(lines)),
+            "section": "auto",
+            "text": snippet,
+        })
+    return chunks
+
+
+def _ocr_page(page: "fitz.Page") -> str:
+    """OCR a rendered page with pytesseract; empty string if OCR is unavailable."""
+    try:
+        import pytesseract
+        from PIL import Image
+    except ImportError:
+        return ""
+    pix = page.get_pixmap(dpi=config.ingestion.ocr_dpi)
+    image = Image.open(io.BytesIO(pix.tobytes("png")))
+    try:
+        return pytesseract.image_to_string(image, lang=config.ingestion.ocr_lang)
+    except (pytesseract.TesseractNotFoundError, pytesseract.TesseractError):
+        return ""
+
+
+def _pymupdf_page_range(path: str, start: int, stop: int, ocr: bool) -> List[Tuple[int, str]]:
+    # Runs inside a worker process: PyMuPDF documents are neither picklable nor
+    # thread-safe, so each worker opens its own handle and reads a contiguous range.
+    import fitz  # PyMuPDF
+
+    pages: List[Tuple[int, str]] = []
+    with fitz.open(path) as doc:
+        for idx in range(start, stop):
+            page = doc.load_page(idx)
+            text = page.get_text("text")
+            if ocr and not text.strip():
+                # Only scanned pages (no text layer) pay for OCR
+                text = _ocr_page(page)
+            pages.append((idx + 1, text))
+    return pages
+
+
+def resolve_pdf_workers(workers: Optional[int] = None) -> int:
+    return workers or config.ingestion.pdf_workers or os.cpu_count() or 1
+
+
+def _pymupdf_pages(
+    file: Path,
+    workers: Optional[int] = None,
+    pool: Optional[Executor] = None,
+) -> List[Tuple[int, str]]:
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(file)) as doc:
+        page_count = doc.page_count
+    ocr = config.ingestion.ocr_enabled
+    workers = min(resolve_pdf_workers(workers), max(1, page_count // MIN_PAGES_PER_WORKER))
+    if workers <= 1:
+        return _pymupdf_page_range(str(file), 0, page_count, ocr)
+    step = -(-page_count // workers)
+    pages: List[Tuple[int, str]] = []
+    # Reuse the caller's pool when given so a directory ingest starts worker processes once
+    with (nullcontext(pool) if pool is not None else ProcessPoolExecutor(max_workers=workers)) as executor:
+        futures = [
+            executor.submit(_pymupdf_page_range, str(file), start, min(start + step, page_count), ocr)
+            for start in range(0, page_count, step)
+        ]
+        # Ranges are submitted in order, so collecting in order keeps page order
+        for fut in futures:
+            pages.extend(fut.result())
+    return pages
+
+
+def _pdfminer_pages(file: Path) -> List[Tuple[int, str]]:
+    from pdfminer.high_level import extract_text
+
+    text = extract_text(str(file))
     # naive split by pages using form feed preserved by pdfminer when possible
     pages = text.split('\f') if '\f' in text else [text]
-    for page_idx, page in enumerate(pages, start=1):
-        lines = [ln.strip() for ln in page.splitlines() if ln.strip()]
-        for i in range(0, len(lines), 6):
-            snippet = " ".join(lines[i:i+6])
-            chunks.append({
-                "page": page_idx,
-                "lineStart": i + 1,
-                "lineEnd": min(i + 6, len(lines)),
-                "section": "auto",
-                "text": snippet,
-            })
+    return list(enumerate(pages, start=1))
+
+
+def pdf_to_chunks(
+    file: Path,
+    backend: Optional[str] = None,
+    workers: Optional[int] = None,
+    pool: Optional[Executor] = None,
+) -> List[Dict]:
+    backend = (backend or config.ingestion.pdf_backend).lower()
+    if backend == "pymupdf":
+        pages = _pymupdf_pages(file, workers, pool)
+    elif backend == "pdfminer":
+        pages = _pdfminer_pages(file)
+    else:
+        raise ValueError(f"Unknown PDF backend {backend!r}; expected one of {PDF_BACKENDS}")
+    chunks: List[Dict] = []
+    for page_idx, page in pages:
+        chunks.extend(text_to_chunks(page, page=page_idx))
     return chunks
 
 
 def xlsx_to_cells(file: Path) -> List[Dict]:
+    import pandas as pd
+
     rows: List[Dict] = []
     xls = pd.ExcelFile(file)
     for sheet in xls.sheet_names:
@@ -84,6 +178,8 @@ def ingest_path(
     company_id: Optional[str] = None,
     max_files: Optional[int] = None,
     progress_every: int = 1000,
+    pdf_backend: Optional[str] = None,
+    pdf_workers: Optional[int] = None,
 ) -> int:
     store = WeaviateStore()
     p = Path(path)
@@ -92,50 +188,48 @@ def ingest_path(
     files = list(p.glob("**/*"))
     ingested = 0
     processed_files = 0
-    for file in files:
-        if file.is_dir():
-            continue
-        processed_files += 1
-        if max_files is not None and processed_files > max_files:
-            break
-        meta = infer_metadata(file)
-        meta["tenantId"] = tenant_id or config.service.tenant_id
-        meta["companyId"] = company_id or str(uuid.uuid4())
-        meta["documentId"] = str(uuid.uuid4())
-        meta["docType"] = file.suffix.lower().lstrip('.')
-        base_props = {k: v for k, v in meta.items() if v is not None}
-        if file.suffix.lower() == ".pdf":
-            chunks = pdf_to_chunks(file)
-            for c in chunks:
-                c.update(base_props)
-            store.upsert_chunks(chunks)
-            ingested += len(chunks)
-        elif file.suffix.lower() in {".xlsx", ".xls"}:
-            cells = xlsx_to_cells(file)
-            for r in cells:
-                r.update(base_props)
-            store.upsert_table_cells(cells)
-            ingested += len(cells)
-        else:
-            # Fallback: treat as plain text
-            text = file.read_text(errors='ignore')
-            chunks = []
-            lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-            for i in range(0, len(lines), 6):
-                snippet = " ".join(lines[i:i+6])
-                chunks.append({
-                    "page": 1,
-                    "lineStart": i + 1,
-                    "lineEnd": min(i + 6, len(lines)),
-                    "section": "auto",
-                    "text": snippet,
-                })
-            for c in chunks:
-                c.update(base_props)
-            store.upsert_chunks(chunks)
-            ingested += len(chunks)
-        if progress_every and ingested and ingested % progress_every == 0:
-            print(f"Progress: {ingested} objects upserted...")
+    # One worker pool for the whole run; created on the first PDF that needs it
+    pool: Optional[ProcessPoolExecutor] = None
+    try:
+        for file in files:
+            if file.is_dir():
+                continue
+            processed_files += 1
+            if max_files is not None and processed_files > max_files:
+                break
+            meta = infer_metadata(file)
+            meta["tenantId"] = tenant_id or config.service.tenant_id
+            meta["companyId"] = company_id or str(uuid.uuid4())
+            meta["documentId"] = str(uuid.uuid4())
+            meta["docType"] = file.suffix.lower().lstrip('.')
+            base_props = {k: v for k, v in meta.items() if v is not None}
+            if file.suffix.lower() == ".pdf":
+                if pool is None and (pdf_backend or config.ingestion.pdf_backend).lower() == "pymupdf" and resolve_pdf_workers(pdf_workers) > 1:
+                    pool = ProcessPoolExecutor(max_workers=resolve_pdf_workers(pdf_workers))
+                chunks = pdf_to_chunks(file, backend=pdf_backend, workers=pdf_workers, pool=pool)
+                for c in chunks:
+                    c.update(base_props)
+                store.upsert_chunks(chunks)
+                ingested += len(chunks)
+            elif file.suffix.lower() in {".xlsx", ".xls"}:
+                cells = xlsx_to_cells(file)
+                for r in cells:
+                    r.update(base_props)
+                store.upsert_table_cells(cells)
+                ingested += len(cells)
+            else:
+                # Fallback: treat as plain text
+                text = file.read_text(errors='ignore')
+                chunks = text_to_chunks(text)
+                for c in chunks:
+                    c.update(base_props)
+                store.upsert_chunks(chunks)
+                ingested += len(chunks)
+            if progress_every and ingested and ingested % progress_every == 0:
+                print(f"Progress: {ingested} objects upserted...")
+    finally:
+        if pool is not None:
+            pool.shutdown()
     return ingested
 
 
@@ -147,6 +241,12 @@ if __name__ == "__main__":
     ap.add_argument("--company-id", default=None)
     ap.add_argument("--max-files", type=int, default=None, help="Process at most N files from the tree")
     ap.add_argument("--progress-every", type=int, default=1000, help="Print a progress line every N objects")
+    ap.add_argument("--pdf-backend", choices=PDF_BACKENDS, default=None, help="PDF text extraction backend (default: PDF_BACKEND env or pymupdf)")
+    ap.add_argument("--pdf-workers", type=int, default=None, help="Worker processes per PDF for the pymupdf backend")
     args = ap.parse_args()
-    count = ingest_path(args.path, args.tenant_id, args.company_id, max_files=args.max_files, progress_every=args.progress_every)
+    count = ingest_path(
+        args.path, args.tenant_id, args.company_id,
+        max_files=args.max_files, progress_every=args.progress_every,
+        pdf_backend=args.pdf_backend, pdf_workers=args.pdf_workers,
+    )
     print(f"Ingested {count} objects")
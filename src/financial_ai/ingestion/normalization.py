@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 GAAP_MAP: Dict[str, str] = {
@@ -12,10 +13,74 @@ GAAP_MAP: Dict[str, str] = {
     "total assets": "TOTAL_ASSETS",
     "total liabilities": "TOTAL_LIABILITIES",
     "total shareholders' equity": "TOTAL_EQUITY",
+    "total stockholders' equity": "TOTAL_EQUITY",
     "net income": "NET_INCOME",
     "revenue": "REVENUE",
+    "total revenue": "REVENUE",
+    "operating income": "OPERATING_INCOME",
+    "cash and cash equivalents": "CASH",
+    "net cash provided by operating activities": "OPERATING_CASH_FLOW",
+    "net cash used in investing activities": "INVESTING_CASH_FLOW",
+    "net cash used in financing activities": "FINANCING_CASH_FLOW",
+    "capital expenditures": "CAPEX",
 }
 
+# us-gaap XBRL tags as they appear in SEC financial statement data sets (num.txt)
+XBRL_TAG_MAP: Dict[str, str] = {
+    "Revenues": "REVENUE",
+    "RevenueFromContractWithCustomerExcludingAssessedTax": "REVENUE",
+    "NetIncomeLoss": "NET_INCOME",
+    "OperatingIncomeLoss": "OPERATING_INCOME",
+    "Assets": "TOTAL_ASSETS",
+    "AssetsCurrent": "CURRENT_ASSETS",
+    "Liabilities": "TOTAL_LIABILITIES",
+    "LiabilitiesCurrent": "CURRENT_LIABILITIES",
+    "StockholdersEquity": "TOTAL_EQUITY",
+    "CashAndCashEquivalentsAtCarryingValue": "CASH",
+    "NetCashProvidedByUsedInOperatingActivities": "OPERATING_CASH_FLOW",
+    "NetCashProvidedByUsedInInvestingActivities": "INVESTING_CASH_FLOW",
+    "NetCashProvidedByUsedInFinancingActivities": "FINANCING_CASH_FLOW",
+    "PaymentsToAcquirePropertyPlantAndEquipment": "CAPEX",
+}
+
+# num.txt rows, current layout: adsh, tag, version, ddate, qtrs, uom, segments, coreg, value
+NUM_ROW_RE = re.compile(
+    r"(?:^|\t)(?P<tag>[A-Za-z]+)\t[^\t]*\t(?P<ddate>\d{8})\t(?P<qtrs>\d+)\t[^\t]*"
+    r"\t(?P<segments>[^\t]*)\t(?P<coreg>[^\t]*)\t(?P<value>-?\d+(?:\.\d+)?)"
+)
+# Older layout: adsh, tag, version, coreg, ddate, qtrs, uom, value
+NUM_ROW_LEGACY_RE = re.compile(
+    r"(?:^|\t)(?P<tag>[A-Za-z]+)\t[^\t]*\t(?P<coreg>[^\t]*)\t(?P<ddate>\d{8})\t(?P<qtrs>\d+)\t[^\t]*"
+    r"\t(?P<value>-?\d+(?:\.\d+)?)"
+)
+# Longest labels first so "total current assets" wins over "current assets"
+LABEL_RE = re.compile(
+    r"\b(?P<label>" + "|".join(re.escape(k) for k in sorted(GAAP_MAP, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+# (?<![\w.]) keeps digits glued to words ("Q2", "FY24", "10-Q") or decimals from matching
+AMOUNT_RE = re.compile(
+    r"(?<![\w.])(?P<num>\(?-?\$?\s?\d[\d,]*(?:\.\d+)?\)?)\s*(?P<unit>%|percent\b|thousands?\b|millions?\b|billions?\b|bn\b|mm\b|mn\b)?",
+    re.IGNORECASE,
+)
+UNIT_MULTIPLIERS: Dict[str, float] = {
+    "thousand": 1e3, "thousands": 1e3,
+    "million": 1e6, "millions": 1e6, "mm": 1e6, "mn": 1e6,
+    "billion": 1e9, "billions": 1e9, "bn": 1e9,
+}
+_MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+# Bare (no $, comma or decimal) numbers that are dates or references, not amounts, judged
+# by what precedes them: "in 2024", "Q2 2024", "June 30, 2024", "June 30", "Note 3"
+YEAR_CONTEXT_RE = re.compile(
+    r"(\b(in|for|of|fiscal|year|fy|since|during|from|through|ended|ending)|\bq[1-4]|\b" + _MONTH + r"(\s+\d{1,2})?,?)\s*$",
+    re.IGNORECASE,
+)
+DAY_CONTEXT_RE = re.compile(r"\b" + _MONTH + r"\s*$", re.IGNORECASE)
+NOTE_CONTEXT_RE = re.compile(r"\b(notes?|item|section)\s*\(?\s*$", re.IGNORECASE)
+# ... or by what follows them: "three months" is spelled out, "6 months" is not
+DURATION_AFTER_RE = re.compile(r"^\s*-?\s*(months?|weeks?|days?|years?|quarters?)\b", re.IGNORECASE)
+# How far past a label to look for its amount
+LABEL_WINDOW = 80
 
 def normalize_label(label: str) -> str:
     key = label.strip().lower()
@@ -27,3 +92,111 @@ class StatementRef:
     statement_type: str  # IS|BS|CF
     year: int
     quarter: Optional[int]
+
+
+def _to_number(raw: str) -> Optional[float]:
+    raw = raw.strip()
+    neg = raw.startswith("(") and raw.endswith(")")
+    digits = raw.strip("()$ ").replace(",", "").replace("$", "").strip()
+    try:
+        value = float(digits)
+    except ValueError:
+        return None
+    return -abs(value) if neg else value
+
+
+def _quarter_end(year: int, quarter: int) -> str:
+    """'YYYYMM' of the quarter's last month; num.txt ddate is rounded to month end."""
+    return f"{year}{quarter * 3:02d}"
+
+
+def _num_candidates(text: str) -> Dict[str, List[Tuple[str, int, float]]]:
+    """key -> [(ddate, qtrs, value)] for consolidated rows (no segments / co-registrant) only."""
+    candidates: Dict[str, List[Tuple[str, int, float]]] = {}
+    for regex in (NUM_ROW_RE, NUM_ROW_LEGACY_RE):
+        for m in regex.finditer(text):
+            key = XBRL_TAG_MAP.get(m.group("tag"))
+            if not key or m.group("coreg"):
+                continue
+            if "segments" in regex.groupindex and m.group("segments"):
+                continue
+            candidates.setdefault(key, []).append((m.group("ddate"), int(m.group("qtrs")), float(m.group("value"))))
+    return candidates
+
+
+def _num_rows(text: str, year: Optional[int], quarter: Optional[int]) -> Dict[str, float]:
+    # Quarterly (qtrs=1) or point-in-time (qtrs=0) rows only; year-to-date rows go through parse_ytd_items
+    items: Dict[str, float] = {}
+    target = _quarter_end(year, quarter) if year and quarter else None
+    for key, rows in _num_candidates(text).items():
+        rows = [(d, v) for d, q, v in rows if q <= 1]
+        if target:
+            # Only the row dated at this quarter's end: a comparative (prior-year) row in
+            # the same chunk must never stand in for a current figure that landed elsewhere
+            exact = [v for d, v in rows if d[:6] == target]
+            if exact:
+                items[key] = exact[0]
+        elif rows:
+            items[key] = max(rows, key=lambda r: r[0])[1]
+    return items
+
+
+def parse_ytd_items(text: str, year: int, quarter: int) -> Dict[str, float]:
+    """Year-to-date num.txt values (qtrs == quarter > 1) dated at the end of year/quarter.
+
+    10-Q cash-flow statements only report year-to-date figures (6 and 9 months, 12 in the
+    10-K), so the quarterly figure is this value minus the previous quarter's year-to-date
+    value. Assumes fiscal quarters line up with the period's calendar quarters.
+    """
+    items: Dict[str, float] = {}
+    if quarter < 2:
+        return items
+    target = _quarter_end(year, quarter)
+    for key, rows in _num_candidates(text).items():
+        exact = [v for d, q, v in rows if q == quarter and d[:6] == target]
+        if exact:
+            items[key] = exact[0]
+    return items
+
+
+def _free_text(text: str) -> Dict[str, float]:
+    items: Dict[str, float] = {}
+    labels = list(LABEL_RE.finditer(text))
+    for i, m in enumerate(labels):
+        key = normalize_label(m.group("label"))
+        if key in items:
+            continue
+        # Look from the label up to the next label (or LABEL_WINDOW chars)
+        stop = min(labels[i + 1].start() if i + 1 < len(labels) else len(text), m.end() + LABEL_WINDOW)
+        window = text[m.end():stop]
+        for a in AMOUNT_RE.finditer(window):
+            raw, unit = a.group("num"), (a.group("unit") or "").lower()
+            if unit in ("%", "percent"):
+                continue  # "increased 12% to ..." is a change, not the amount
+            bare = raw.strip().strip("()").rstrip(",")
+            if bare.isdigit():
+                before = window[:a.start()]
+                if re.fullmatch(r"(19|20)\d{2}", bare) and YEAR_CONTEXT_RE.search(before):
+                    continue  # "revenue in 2024 ...", "Q2 2024", "June 30, 2024"
+                if int(bare) <= 31 and DAY_CONTEXT_RE.search(before):
+                    continue  # "June 30"
+                if NOTE_CONTEXT_RE.search(before) or DURATION_AFTER_RE.match(window[a.end("num"):]):
+                    continue  # "(Note 3)", "6 months ended"
+            value = _to_number(raw)
+            if value is not None:
+                items[key] = value * UNIT_MULTIPLIERS.get(unit, 1.0)
+                break
+    return items
+
+
+def parse_line_items(text: str, year: Optional[int] = None, quarter: Optional[int] = None) -> Dict[str, float]:
+    """Extract normalized line items (GAAP_MAP keys) from a chunk of text.
+
+    Understands SEC num.txt rows (both layouts; consolidated, quarterly or point-in-time
+    rows dated exactly at the end of year/quarter when given, else the latest) and free-text
+    statements like "Total current assets 1,234" or "Revenue rose 12% to $1.2 billion".
+    num.txt wins. Year-to-date num.txt rows are handled by parse_ytd_items.
+    """
+    items = _free_text(text)
+    items.update(_num_rows(text, year, quarter))
+    return items
@@ -1,19 +1,85 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Any, Dict, List, Optional
-import os
-import requests
 from datetime import datetime
 
 from ..config import config
 from ..tools.retrieval import retrieve_context, format_context_label
 from ..tools.excel_artifact import save_results_workbook
-from ..storage.weaviate_client import WeaviateStore
+from ..storage.weaviate_client import get_store
 from ..tools.ratios import compute_basic_ratios
+from ..tools import trends
 
-app = FastAPI(title="Financial AI MCP", version="0.1.0")
+# Heavy clients (weaviate, requests, openpyxl) are imported on first use; warm_up()
+# pays that cost plus connection setup and model load before readiness is reported.
+_warm: Dict[str, bool] = {"weaviate": False, "ollama": False}
+
+
+def _warm_weaviate() -> bool:
+    try:
+        return bool(get_store().client.is_ready())
+    except Exception:
+        return False
+
+
+def _warm_ollama(timeout: float) -> bool:
+    """Load the model into Ollama memory (a generate call without a prompt) and keep it resident."""
+    try:
+        import requests
+
+        resp = requests.post(
+            f"{config.llm.ollama_url}/api/generate",
+            json={"model": config.llm.ollama_model, "keep_alive": config.llm.ollama_keep_alive},
+            timeout=timeout,
+        )
+        return resp.status_code == 200
+    except Exception:
+        return False
+
+
+def warm_up(ollama_timeout: float = 120) -> Dict[str, bool]:
+    """Pre-connect to Weaviate and pre-load the Ollama model; retries only what isn't warm yet.
+
+    Blocking: call it from a worker thread (run_in_threadpool), never on the event loop.
+    """
+    if not _warm["weaviate"]:
+        _warm["weaviate"] = _warm_weaviate()
+    if not _warm["ollama"]:
+        _warm["ollama"] = _warm_ollama(ollama_timeout)
+    return dict(_warm)
+
+
+WARMUP_RETRY_SECONDS = 15
+WARMUP_RETRY_TIMEOUT = 10
+
+
+async def _retry_warm_up() -> None:
+    # Ollama keeps loading the model after a client timeout, so short retries converge
+    while not all(_warm.values()):
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+        await run_in_threadpool(warm_up, WARMUP_RETRY_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn only starts accepting connections once the first warm-up attempt returns
+    retry: Optional[asyncio.Task] = None
+    if config.service.warmup:
+        await run_in_threadpool(warm_up)
+        if not all(_warm.values()):
+            retry = asyncio.create_task(_retry_warm_up())
+    yield
+    if retry is not None:
+        retry.cancel()
+
+
+app = FastAPI(title="Financial AI MCP", version="0.1.0", lifespan=lifespan)
 def _timestamped_filename(prefix: str, ext: str = "xlsx") -> str:
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     return f"{prefix}_{ts}.{ext}"
@@ -22,10 +88,16 @@ def _timestamped_filename(prefix: str, ext: str = "xlsx") -> str:
 def _ollama_generate(prompt: str) -> str:
     """Generate text using local Ollama server if available, else fallback."""
     try:
-        model = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+        import requests
+
         resp = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
+            f"{config.llm.ollama_url}/api/generate",
+            json={
+                "model": config.llm.ollama_model,
+                "prompt": prompt,
+                "stream": False,
+                "keep_alive": config.llm.ollama_keep_alive,
+            },
             timeout=60,
         )
         if resp.status_code == 200:
@@ -36,6 +108,19 @@ def _ollama_generate(prompt: str) -> str:
         return ""
 
 
+def _format_location(obj: Dict[str, Any]) -> str:
+    """Location suffix like ' (Doc: 10k, Page 3, Lines 1-6)', or '' if unknown."""
+    location_parts = []
+    doc_name = obj.get("docName", "")
+    if doc_name:
+        location_parts.append(f"Doc: {doc_name}")
+    if obj.get("page"):
+        location_parts.append(f"Page {obj['page']}")
+    if obj.get("lineStart") and obj.get("lineEnd"):
+        location_parts.append(f"Lines {obj['lineStart']}-{obj['lineEnd']}")
+    return f" ({', '.join(location_parts)})" if location_parts else ""
+
+
 def _format_evidence(obj: Dict[str, Any]) -> str:
     """Format evidence text to be human-readable with location info."""
     text = obj.get("text", "")
@@ -64,16 +149,7 @@ def _format_evidence(obj: Dict[str, Any]) -> str:
                     readable_lines.append(concept)
     
     # Add location info
-    location_parts = []
-    doc_name = obj.get("docName", "")
-    if doc_name:
-        location_parts.append(f"Doc: {doc_name}")
-    if obj.get("page"):
-        location_parts.append(f"Page {obj['page']}")
-    if obj.get("lineStart") and obj.get("lineEnd"):
-        location_parts.append(f"Lines {obj['lineStart']}-{obj['lineEnd']}")
-    
-    location_str = f" ({', '.join(location_parts)})" if location_parts else ""
+    location_str = _format_location(obj)
     
     if readable_lines:
         return f"{' | '.join(readable_lines)}{location_str}"
@@ -102,7 +178,7 @@ class SummaryRequest(BaseModel):
 
 @app.post("/tools/financial_summary")
 async def financial_summary(req: SummaryRequest) -> Dict[str, Any]:
-    store = WeaviateStore()
+    store = get_store()
     ctx = retrieve_context(req.question, req.tenant_id, req.company_id, req.period.year if req.period else None, req.period.quarter if req.period else None)
     results_rows: List[Dict[str, Any]] = []
     citations_rows: List[Dict[str, Any]] = []
@@ -146,7 +222,7 @@ class QARequest(BaseModel):
 
 @app.post("/tools/qa")
 async def qa(req: QARequest) -> Dict[str, Any]:
-    store = WeaviateStore()
+    store = get_store()
     ctx = retrieve_context(req.question, req.tenant_id, req.company_id, req.period.year if req.period else None, req.period.quarter if req.period else None)
     # Build a compact prompt from top-k contexts
     k = 6
@@ -250,6 +326,120 @@ async def ratios(req: RatioRequest) -> Dict[str, Any]:
     return {"artifact_uri": path, "rows": len(results_rows)}
 
 
+class TrendRequest(BaseModel):
+    tenant_id: str
+    company_id: str
+    start: Period
+    end: Period
+    metrics: Optional[List[str]] = None
+    question: str = "Summarize cash flow and financial trends"
+
+
+# Plain def: retrieval fan-out, the LLM call and the workbook all block, so FastAPI
+# runs this in its threadpool instead of on the event loop
+@app.post("/tools/cashflow_insights")
+def cashflow_insights(req: TrendRequest) -> Dict[str, Any]:
+    if None in (req.start.year, req.start.quarter, req.end.year, req.end.quarter):
+        raise HTTPException(status_code=400, detail="start and end need both year and quarter")
+    try:
+        periods = trends.period_range((req.start.year, req.start.quarter), (req.end.year, req.end.quarter))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    store = get_store()
+    metrics = [m.upper() for m in req.metrics] if req.metrics else trends.DEFAULT_METRICS
+    query = " ".join(m.replace("_", " ").lower() for m in metrics)
+    # One concurrent fan-out instead of a sequential retrieval cascade per period
+    contexts = trends.fetch_period_contexts(query, req.tenant_id, req.company_id, trends.with_lookback(periods))
+    table = trends.build_trend_table(contexts, periods, metrics)
+    delta_table = trends.format_delta_table(table)
+
+    # Single LLM call over the compact delta table rather than raw chunks
+    prompt = (
+        f"You are a financial analyst at Lyst.ai. Using ONLY the table below, describe the most important trends."
+        f"\nQuestion: {req.question}\n\nPeriod-by-metric values with QoQ/YoY changes:\n{delta_table}\n\n"
+        f"Reply ONLY as bullet lines like '- Revenue up 10% YoY in 2025Q2', '- Operating cash flow fell 5% QoQ'."
+    )
+    notes_bullets = _ollama_generate(prompt) if len(delta_table.splitlines()) > 1 else ""
+
+    last = trends.period_label(periods[-1])
+    results_rows: List[Dict[str, Any]] = []
+    citations_rows: List[Dict[str, Any]] = []
+    for metric in table.values.columns:
+        series = table.values[metric].dropna()
+        if series.empty:
+            continue
+        label = series.index[-1]
+        qoq, yoy = table.qoq.at[label, metric], table.yoy.at[label, metric]
+        changes = [f"{name} {trends.format_pct(d)}" for name, d in (("QoQ", qoq), ("YoY", yoy)) if d == d]
+        src = table.sources.get((label, metric), {})
+        results_rows.append({
+            "context": f"{metric} | {label}",
+            "evidence": trends.format_amount(series.iloc[-1]) + _format_location(src),
+            "answer": ", ".join(changes) or "No prior period",
+            "notes": "",
+        })
+    # One citation per source object, even when it supplied several metrics
+    cited = set()
+    for o in table.sources.values():
+        key = o.get("_additional", {}).get("id") or (o.get("sourceUri"), o.get("page"), o.get("lineStart"))
+        if key in cited:
+            continue
+        cited.add(key)
+        citations_rows.append({
+            "doc_name": o.get("docName"),
+            "source_uri": o.get("sourceUri"),
+            "doc_type": o.get("docType"),
+            "statement_type": o.get("statementType"),
+            "year": o.get("periodYear"),
+            "quarter": o.get("periodQuarter"),
+            "page": o.get("page"),
+            "line_start": o.get("lineStart"),
+            "line_end": o.get("lineEnd"),
+            "sheet": o.get("sheet"),
+            "cell_range": o.get("cellRange"),
+            "quote": (o.get("text") or "")[:200],
+            "chunk_id": o.get("_additional", {}).get("id"),
+            "score": o.get("_additional", {}).get("score"),
+        })
+    if results_rows:
+        results_rows[0]["notes"] = notes_bullets
+    else:
+        results_rows.append({"context": "No line items found", "evidence": None, "answer": "No insights", "notes": ""})
+
+    inputs_rows = [
+        {"key": "Question", "value": req.question},
+        {"key": "Periods", "value": f"{trends.period_label(periods[0])} - {last} ({len(periods)} quarters)"},
+        {"key": "Metrics", "value": ", ".join(metrics)},
+        {"key": "Company ID", "value": req.company_id},
+        {"key": "Generated", "value": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+        {"key": "Periods With Data", "value": str(sum(1 for p in periods if contexts.get(p)))},
+    ]
+    path = save_results_workbook(
+        results_rows, citations_rows, inputs_rows,
+        filename=_timestamped_filename("cashflow_insights"),
+        extra_sheets={
+            "Trend": trends.period_metric_rows(table.values),
+            "QoQ %": trends.period_metric_rows(table.qoq),
+            "YoY %": trends.period_metric_rows(table.yoy),
+        },
+        number_formats={"QoQ %": "0.0%", "YoY %": "0.0%"},
+    )
+    log_id = store.create_answer_log({"tenantId": req.tenant_id, "companyId": req.company_id, "question": req.question, "answerText": notes_bullets, "artifactUri": path, "tool": "cashflow_insights"})
+    for c in citations_rows:
+        c.update({"tenantId": req.tenant_id, "companyId": req.company_id, "answerLogId": log_id})
+    store.create_citations(citations_rows)
+    return {"artifact_uri": path, "rows": len(results_rows), "periods": len(periods), "answer_log_id": log_id}
+
+
 @app.get("/health")
 async def health() -> Dict[str, str]:
     return {"status": "ok", "artifacts_dir": config.service.artifacts_dir}
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    # Readiness (unlike /health liveness) waits for warm-up. Only reports cached state;
+    # retries run in the background task started by lifespan, never on the probe.
+    state = dict(_warm)
+    is_ready = all(state.values()) or not config.service.warmup
+    return JSONResponse({"ready": is_ready, **state}, status_code=200 if is_ready else 503)
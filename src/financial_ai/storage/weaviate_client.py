@@ -1,62 +1,153 @@
 from __future__ import annotations
 
-import weaviate
-from weaviate.auth import AuthApiKey
-from typing import Any, Dict, List, Optional
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 from ..config import config
 
+logger = logging.getLogger(__name__)
+
+# Everything but batch_size, which each call sets explicitly
+BATCH_CONFIG: Dict[str, Any] = {"num_workers": 2, "dynamic": False, "timeout_retries": 0}
+
 
 class WeaviateStore:
+    """Weaviate access shared by the whole process (see get_store).
+
+    Thread-safety: queries are independent HTTP requests on the client's session
+    and may be issued from several threads (trend retrieval fans out this way).
+    client.batch is a single stateful object, so batch writes are serialized by
+    _batch_lock, and the tenant/schema caches are guarded by _schema_lock.
+    """
+
     def __init__(self) -> None:
+        # Imported here so importing the API server doesn't pay for the client library
+        import weaviate
+        from weaviate.auth import AuthApiKey
+
         auth = AuthApiKey(api_key=config.weaviate.api_key) if config.weaviate.api_key else None
         self.client = weaviate.Client(url=config.weaviate.endpoint, auth_client_secret=auth)
         # Tune batch to be gentle and avoid long waits
-        self.client.batch.configure(batch_size=64, num_workers=2, dynamic=False, timeout_retries=0)
+        self.client.batch.configure(batch_size=64, **BATCH_CONFIG)
         self.class_chunk = config.weaviate.class_chunk
         self.class_table = config.weaviate.class_table
+        self.multi_tenancy = config.weaviate.multi_tenancy
+        self._known_tenants: Dict[str, Set[str]] = {}
+        self._checked_classes: Set[str] = set()
+        self._batch_lock = threading.Lock()
+        self._schema_lock = threading.RLock()
+
+    def _check_multi_tenant(self, class_name: str) -> None:
+        """Fail loudly if multi-tenancy is on but the class was never migrated."""
+        if not self.multi_tenancy or class_name in self._checked_classes:
+            return
+        with self._schema_lock:
+            if class_name in self._checked_classes:
+                return
+            schema = self.client.schema.get(class_name)
+            if not (schema.get("multiTenancyConfig") or {}).get("enabled"):
+                raise RuntimeError(
+                    f"Weaviate class {class_name} is not multi-tenant; run "
+                    f"'python scripts/apply_weaviate_schema.py --migrate' or set WEAVIATE_MULTI_TENANCY=0"
+                )
+            self._checked_classes.add(class_name)
+
+    def _hits(self, res: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # GraphQL errors (e.g. unknown tenant) come back in the body, not as exceptions
+        if res.get("errors"):
+            logger.warning("Weaviate query on %s failed: %s", self.class_chunk, res["errors"])
+        return (res.get("data") or {}).get("Get", {}).get(self.class_chunk) or []
+
+    def _tenant(self, tenant_id: Optional[str]) -> Optional[str]:
+        if not self.multi_tenancy:
+            return None
+        if not tenant_id:
+            raise ValueError("tenant_id is required when Weaviate multi-tenancy is enabled")
+        return tenant_id
+
+    def ensure_tenants(self, class_name: str, tenant_ids: Iterable[Optional[str]]) -> None:
+        """Create any missing tenant shards for a class (no-op without multi-tenancy)."""
+        if not self.multi_tenancy:
+            return
+        self._check_multi_tenant(class_name)
+        with self._schema_lock:
+            known = self._known_tenants.get(class_name)
+            if known is None:
+                known = {t.name for t in self.client.schema.get_class_tenants(class_name)}
+                self._known_tenants[class_name] = known
+            missing = sorted({t for t in tenant_ids if t} - known)
+            if missing:
+                from weaviate import Tenant
+
+                self.client.schema.add_class_tenants(class_name, [Tenant(name=t) for t in missing])
+                known.update(missing)
+
+    def _batch_add(self, class_name: str, objects: List[Dict[str, Any]], batch_size: int = 64) -> None:
+        self.ensure_tenants(class_name, {props.get("tenantId") for props in objects})
+        with self._batch_lock:
+            # Set the size on every call so one caller's size never leaks into the next
+            self.client.batch.configure(batch_size=batch_size, **BATCH_CONFIG)
+            with self.client.batch as batch:
+                for props in objects:
+                    batch.add_data_object(props, class_name=class_name, tenant=self._tenant(props.get("tenantId")))
 
     def upsert_chunks(self, objects: List[Dict[str, Any]]) -> None:
-        with self.client.batch as batch:
-            for props in objects:
-                batch.add_data_object(props, class_name=self.class_chunk)
+        self._batch_add(self.class_chunk, objects)
 
     def upsert_table_cells(self, rows: List[Dict[str, Any]]) -> None:
-        with self.client.batch as batch:
-            for props in rows:
-                batch.add_data_object(props, class_name=self.class_table)
+        self._batch_add(self.class_table, rows)
 
     def create_answer_log(self, props):
-        uid = self.client.data_object.create(props, class_name="AnswerLog")
+        self.ensure_tenants("AnswerLog", [props.get("tenantId")])
+        uid = self.client.data_object.create(props, class_name="AnswerLog", tenant=self._tenant(props.get("tenantId")))
         return uid
 
     def create_citations(self, rows):
-        with self.client.batch as batch:
-            batch.batch_size = 100
-            for props in rows:
-                batch.add_data_object(props, class_name="Citation")
+        self._batch_add("Citation", rows, batch_size=100)
 
-    def hybrid_search(self, query: str, where: Optional[Dict[str, Any]] = None, limit: int = 50) -> List[Dict[str, Any]]:
-        # Primary: BM25 search
+    def _get_chunks(self, props: List[str], limit: int, tenant_id: Optional[str]):
+        q = self.client.query.get(self.class_chunk, props).with_limit(limit)
+        tenant = self._tenant(tenant_id)
+        if tenant:
+            self._check_multi_tenant(self.class_chunk)
+            q = q.with_tenant(tenant)
+        return q
+
+    def hybrid_search(
+        self,
+        query: str,
+        where: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        tenant_id: Optional[str] = None,
+        global_fallback: bool = True,
+    ) -> List[Dict[str, Any]]:
+        # With multi-tenancy every query below only touches the tenant's shard,
+        # so cost scales with that tenant's data rather than the whole corpus.
         props = [
-            "docName", "sourceUri", "docType", "periodYear", "periodQuarter",
+            "companyId", "docName", "sourceUri", "docType", "periodYear", "periodQuarter",
             "page", "lineStart", "lineEnd", "section", "text"
         ]
-        q = self.client.query.get(self.class_chunk, props).with_bm25(query=query).with_limit(limit)
+        # Primary: BM25 search
+        q = self._get_chunks(props, limit, tenant_id).with_bm25(query=query)
         if where:
             q = q.with_where(where)
-        res = q.do()
-        hits = res.get('data', {}).get('Get', {}).get(self.class_chunk, [])
+        hits = self._hits(q.do())
         if hits:
             return hits
         # Fallback 1: ignore BM25, return any objects matching filter
-        q2 = self.client.query.get(self.class_chunk, props).with_limit(limit)
+        q2 = self._get_chunks(props, limit, tenant_id)
         if where:
             q2 = q2.with_where(where)
-        res2 = q2.do()
-        hits2 = res2.get('data', {}).get('Get', {}).get(self.class_chunk, [])
-        if hits2:
+        hits2 = self._hits(q2.do())
+        if hits2 or not global_fallback:
             return hits2
-        # Fallback 2: return any objects globally
-        res3 = self.client.query.get(self.class_chunk, props).with_limit(limit).do()
-        return res3.get('data', {}).get('Get', {}).get(self.class_chunk, [])
+        # Fallback 2: return any objects (tenant shard-wide under multi-tenancy, else global)
+        return self._hits(self._get_chunks(props, limit, tenant_id).do())
+
+
+@lru_cache(maxsize=None)
+def get_store() -> WeaviateStore:
+    """Process-wide store so the connection set up during warm-up is reused by requests."""
+    return WeaviateStore()
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
 import os
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
 
 from ..config import config
 
 
 def autosize(ws) -> None:
+    from openpyxl.utils import get_column_letter
+
     for col_cells in ws.iter_cols(min_row=1):
         length = max(
             (len(str(cell.value)) if cell.value is not None else 0)
@@ -22,8 +22,13 @@ def save_results_workbook(
     results_rows: Iterable[Dict[str, Any]],
     citations_rows: Iterable[Dict[str, Any]],
     inputs_rows: Iterable[Dict[str, Any]] = tuple(),
-    filename: str = "result.xlsx"
+    filename: str = "result.xlsx",
+    extra_sheets: Optional[Dict[str, List[List[Any]]]] = None,
+    number_formats: Optional[Dict[str, str]] = None,
 ) -> str:
+    # openpyxl is imported on first use so the API server starts without it
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws_res = wb.active
     ws_res.title = "Results"
@@ -61,6 +66,21 @@ def save_results_workbook(
         ws_in.append([kv.get("key"), kv.get("value")])
     autosize(ws_in)
 
+    # Additional tabular sheets: sheet title -> rows (first row is the header)
+    for title, rows in (extra_sheets or {}).items():
+        ws_extra = wb.create_sheet(title)
+        for r in rows:
+            ws_extra.append(r)
+        # Optional Excel number format (e.g. "0.0%") for the data cells, i.e. below the
+        # header and right of the row label column
+        fmt = (number_formats or {}).get(title)
+        if fmt:
+            for row in ws_extra.iter_rows(min_row=2, min_col=2):
+                for cell in row:
+                    if isinstance(cell.value, (int, float)):
+                        cell.number_format = fmt
+        autosize(ws_extra)
+
     out_path = os.path.join(config.service.artifacts_dir, filename)
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     wb.save(out_path)
@@ -2,46 +2,69 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from ..storage.weaviate_client import WeaviateStore
+from ..config import config
+from ..storage.weaviate_client import get_store
 
 
-def _where_filter(tenant_id: str, company_id: str, year: Optional[int] = None, quarter: Optional[int] = None, statement: Optional[str] = None) -> Dict[str, Any]:
-    operands = [
-        {"path": ["tenantId"], "operator": "Equal", "valueText": tenant_id},
+def _tenant_operands(tenant_id: str) -> List[Dict[str, Any]]:
+    # Under native multi-tenancy the query already targets the tenant's shard,
+    # so filtering on the tenantId property would only add cost.
+    if config.weaviate.multi_tenancy:
+        return []
+    return [{"path": ["tenantId"], "operator": "Equal", "valueText": tenant_id}]
+
+
+def _and(operands: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not operands:
+        return None
+    return {"operator": "And", "operands": operands}
+
+
+def _where_filter(tenant_id: str, company_id: str, year: Optional[int] = None, quarter: Optional[int] = None, statement: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    operands = _tenant_operands(tenant_id) + [
         {"path": ["companyId"], "operator": "Equal", "valueText": company_id},
     ]
     if year is not None:
-        operands.append({"path": ["periodYear"], "operator": "Equal", "valueNumber": int(year)})
+        operands.append({"path": ["periodYear"], "operator": "Equal", "valueInt": int(year)})
     if quarter is not None:
-        operands.append({"path": ["periodQuarter"], "operator": "Equal", "valueNumber": int(quarter)})
+        operands.append({"path": ["periodQuarter"], "operator": "Equal", "valueInt": int(quarter)})
     if statement is not None:
         operands.append({"path": ["statementType"], "operator": "Equal", "valueText": statement})
-    return {"operator": "And", "operands": operands}
+    return _and(operands)
 
 
 def retrieve_context(query: str, tenant_id: str, company_id: str, year: Optional[int] = None, quarter: Optional[int] = None, k: int = 12) -> List[Dict[str, Any]]:
-    store = WeaviateStore()
+    store = get_store()
     # Strict: tenant + company + optional period
     where_strict = _where_filter(tenant_id, company_id, year, quarter)
-    results = store.hybrid_search(query, where=where_strict, limit=max(k, 12))
+    results = store.hybrid_search(query, where=where_strict, limit=max(k, 12), tenant_id=tenant_id)
     if results:
         return results
     # Relaxed: tenant only + optional period
-    where_tenant: Dict[str, Any] = {
-        "operator": "And",
-        "operands": [
-            {"path": ["tenantId"], "operator": "Equal", "valueText": tenant_id},
-        ],
-    }
+    operands = _tenant_operands(tenant_id)
     if year is not None:
-        where_tenant["operands"].append({"path": ["periodYear"], "operator": "Equal", "valueNumber": int(year)})
+        operands.append({"path": ["periodYear"], "operator": "Equal", "valueInt": int(year)})
     if quarter is not None:
-        where_tenant["operands"].append({"path": ["periodQuarter"], "operator": "Equal", "valueNumber": int(quarter)})
-    results = store.hybrid_search(query, where=where_tenant, limit=max(k, 12))
+        operands.append({"path": ["periodQuarter"], "operator": "Equal", "valueInt": int(quarter)})
+    results = store.hybrid_search(query, where=_and(operands), limit=max(k, 12), tenant_id=tenant_id)
     if results:
         return results
-    # Fallback: no filter (global)
-    return store.hybrid_search(query, where=None, limit=max(k, 12))
+    # Fallback: no filter (global, or the whole tenant shard under multi-tenancy)
+    return store.hybrid_search(query, where=None, limit=max(k, 12), tenant_id=tenant_id)
+
+
+def retrieve_period_context(query: str, tenant_id: str, company_id: str, year: int, quarter: int, k: int = 12) -> List[Dict[str, Any]]:
+    """Strict tenant + company + period retrieval with no relaxation, for per-period figures."""
+    store = get_store()
+    where = _where_filter(tenant_id, company_id, year, quarter)
+    results = store.hybrid_search(query, where=where, limit=max(k, 12), tenant_id=tenant_id, global_fallback=False)
+    # Belt and braces: never let another company's or quarter's object through
+    return [
+        o for o in results
+        if o.get("companyId") == company_id
+        and o.get("periodYear") is not None and o.get("periodQuarter") is not None
+        and (int(o["periodYear"]), int(o["periodQuarter"])) == (int(year), int(quarter))
+    ]
 
 
 def format_context_label(obj: Dict[str, Any]) -> str:
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..ingestion.normalization import parse_line_items, parse_ytd_items
+from .retrieval import retrieve_period_context
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PeriodKey = Tuple[int, int]  # (year, quarter)
+
+DEFAULT_METRICS: List[str] = [
+    "REVENUE", "OPERATING_INCOME", "NET_INCOME",
+    "OPERATING_CASH_FLOW", "INVESTING_CASH_FLOW", "FINANCING_CASH_FLOW", "CAPEX", "CASH",
+    "CURRENT_ASSETS", "CURRENT_LIABILITIES", "TOTAL_ASSETS", "TOTAL_LIABILITIES", "TOTAL_EQUITY",
+]
+MAX_PERIODS = 20
+# Extra quarters fetched before the requested range so its first quarters get QoQ/YoY baselines
+LOOKBACK_QUARTERS = 4
+
+
+def period_label(p: PeriodKey) -> str:
+    return f"{p[0]}Q{p[1]}"
+
+
+def period_range(start: PeriodKey, end: PeriodKey) -> List[PeriodKey]:
+    """Inclusive, contiguous list of quarters from start to end."""
+    for _, q in (start, end):
+        if not 1 <= q <= 4:
+            raise ValueError(f"quarter must be 1-4, got {q}")
+    first, last = start[0] * 4 + start[1] - 1, end[0] * 4 + end[1] - 1
+    if last < first:
+        raise ValueError(f"end period {period_label(end)} is before start {period_label(start)}")
+    if last - first + 1 > MAX_PERIODS:
+        raise ValueError(f"at most {MAX_PERIODS} quarters per request")
+    return [(i // 4, i % 4 + 1) for i in range(first, last + 1)]
+
+
+def with_lookback(periods: List[PeriodKey]) -> List[PeriodKey]:
+    """periods preceded by LOOKBACK_QUARTERS earlier quarters."""
+    first = periods[0][0] * 4 + periods[0][1] - 1
+    return [(i // 4, i % 4 + 1) for i in range(first - LOOKBACK_QUARTERS, first)] + list(periods)
+
+
+@dataclass
+class TrendTable:
+    periods: List[PeriodKey]
+    values: "pd.DataFrame"  # index: period label, columns: metric
+    qoq: "pd.DataFrame"
+    yoy: "pd.DataFrame"
+    # (period label, metric) -> retrieved object the value was read from
+    sources: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    contexts: Dict[PeriodKey, List[Dict[str, Any]]] = field(default_factory=dict)
+
+
+def fetch_period_contexts(
+    query: str,
+    tenant_id: str,
+    company_id: str,
+    periods: List[PeriodKey],
+    k: int = 20,
+    max_workers: int = 8,
+) -> Dict[PeriodKey, List[Dict[str, Any]]]:
+    """Run one strict (tenant + company + period) retrieval per period concurrently."""
+    def one(p: PeriodKey) -> List[Dict[str, Any]]:
+        return retrieve_period_context(query, tenant_id, company_id, p[0], p[1], k=k)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(periods)))) as pool:
+        return dict(zip(periods, pool.map(one, periods)))
+
+
+def _change(values: "pd.DataFrame", periods: int) -> "pd.DataFrame":
+    import numpy as np
+
+    base = values.shift(periods)
+    # Divide by |base| so the sign follows the direction of the move even for
+    # outflows: investing cash flow -100 -> -200 is -100%, not +100%
+    return ((values - base) / base.abs()).replace([np.inf, -np.inf], np.nan)
+
+
+def build_trend_table(
+    contexts: Dict[PeriodKey, List[Dict[str, Any]]],
+    periods: List[PeriodKey],
+    metrics: Optional[List[str]] = None,
+) -> TrendTable:
+    """Period-by-metric table for periods; contexts should also cover with_lookback(periods)."""
+    import pandas as pd
+
+    metrics = metrics or DEFAULT_METRICS
+    all_periods = with_lookback(periods)
+    rows: Dict[str, Dict[str, float]] = {}
+    ytd: Dict[PeriodKey, Dict[str, Tuple[float, Dict[str, Any]]]] = {}
+    sources: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for p in all_periods:
+        label = period_label(p)
+        row: Dict[str, float] = {}
+        ytd[p] = {}
+        # Contexts are relevance-ordered, so the first object mentioning an item wins
+        for obj in contexts.get(p, []):
+            text = obj.get("text") or ""
+            for key, value in parse_line_items(text, p[0], p[1]).items():
+                if key in metrics and key not in row:
+                    row[key] = value
+                    sources[(label, key)] = obj
+            for key, value in parse_ytd_items(text, p[0], p[1]).items():
+                if key in metrics and key not in ytd[p]:
+                    ytd[p][key] = (value, obj)
+        rows[label] = row
+
+    def cumulative(p: PeriodKey, key: str) -> Optional[float]:
+        """Year-to-date value of key through p, from YTD rows or summed quarterly values."""
+        if key in ytd.get(p, {}):
+            return ytd[p][key][0]
+        value = rows.get(period_label(p), {}).get(key)
+        if p[1] == 1 or value is None:
+            return value
+        before = cumulative((p[0], p[1] - 1), key)
+        return None if before is None else before + value
+
+    # Cash-flow statements in 10-Q/10-K filings are year-to-date only (6, 9, 12 months):
+    # a quarter with no quarterly figure gets YTD(q) - YTD(q - 1)
+    for p in all_periods:
+        row = rows[period_label(p)]
+        for key, (value, obj) in ytd[p].items():
+            if key in row:
+                continue
+            before = cumulative((p[0], p[1] - 1), key)
+            if before is not None:
+                row[key] = value - before
+                sources[(period_label(p), key)] = obj
+
+    all_labels = [period_label(p) for p in all_periods]
+    values = pd.DataFrame.from_dict(rows, orient="index").reindex(index=all_labels, columns=metrics).astype(float)
+    # Periods are contiguous quarters, so shift 1 is QoQ and shift 4 is YoY, for all metrics at once
+    qoq, yoy = _change(values, 1), _change(values, 4)
+    # Look-back quarters only serve as baselines; drop them from the output
+    labels = [period_label(p) for p in periods]
+    keep = set(labels)
+    return TrendTable(
+        periods,
+        values.loc[labels], qoq.loc[labels], yoy.loc[labels],
+        {k: v for k, v in sources.items() if k[0] in keep},
+        {p: contexts.get(p, []) for p in periods},
+    )
+
+
+def format_amount(v: float) -> str:
+    for div, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(v) >= div:
+            return f"{v / div:.2f}{suffix}"
+    return f"{v:.2f}"
+
+
+def format_pct(v: float) -> str:
+    return f"{v * 100:+.1f}%"
+
+
+def format_delta_table(table: TrendTable) -> str:
+    """Compact text table for the LLM: one line per metric, 'value (QoQ, YoY)' per period."""
+    lines = ["metric | " + " | ".join(table.values.index)]
+    for metric in table.values.columns:
+        series = table.values[metric]
+        if series.isna().all():
+            continue
+        cells = []
+        for label in table.values.index:
+            v = series[label]
+            if v != v:  # NaN
+                cells.append("n/a")
+                continue
+            deltas = [f"{name} {format_pct(d)}" for name, d in (("QoQ", table.qoq.at[label, metric]), ("YoY", table.yoy.at[label, metric])) if d == d]
+            cells.append(format_amount(v) + (f" ({', '.join(deltas)})" if deltas else ""))
+        lines.append(f"{metric} | " + " | ".join(cells))
+    return "\n".join(lines)
+
+
+def period_metric_rows(df: "pd.DataFrame") -> List[List[Any]]:
+    """Header + one row per period, NaN as empty cells, for an Excel sheet."""
+    out: List[List[Any]] = [["Period"] + list(df.columns)]
+    for label, row in df.iterrows():
+        out.append([label] + [None if v != v else float(v) for v in row.tolist()])
+    return out